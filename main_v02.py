@@ -1,9 +1,308 @@
+import copy
+import hashlib
+import multiprocessing
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import numpy as np
 import pandas as pd
-import pulp as pl
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Column layout of the per-product result tables
+PURCHASE_COLUMNS = ['Product', 'Day', 'Distributor', 'Batch_Day', 'Quantity',
+                    'Shelf_Age', 'Policy', 'Proportion', 'Transport_Cost']
+PURCHASE_DTYPES = {'Day': 'int32', 'Batch_Day': 'int32', 'Quantity': 'int32', 'Shelf_Age': 'int16',
+                   'Policy': 'int16', 'Proportion': 'float64', 'Transport_Cost': 'float64'}
+WASTE_COLUMNS = ['Product', 'Batch_Day', 'Initial', 'Waste', 'Waste_Pct', 'Waste_Pct_Display']
+
+# Number of distinct input sets whose simulation/optimization results are kept
+RESULT_CACHE_SIZE = 8
+
+# xlsxwriter streams numeric cells much faster than openpyxl. Its constant_memory
+# mode is not used: pandas writes cells column by column, which that mode drops.
+EXCEL_ENGINE = 'xlsxwriter'
+
+# Multi-product simulations of at least this many product-days run in worker
+# processes; below it, pool startup (and each worker loading the compiled
+# kernel) costs more than simulating the products one after another
+PARALLEL_SIM_MIN_PRODUCT_DAYS = 10_000
+
+# Exports with at least this many inventory cells (on a multi-core machine) write
+# each product's Batch and Inventory sheets to their own workbook in a
+# {stem}_products folder, in parallel worker processes
+PARALLEL_EXPORT_MIN_CELLS = 200_000
+
+
+def _sim_kernel(prod_qty, shelf_life, event_days, dist_policy, dist_prop, dist_buy,
+                qty, waste, inventory_delta, batch_col, out_rows):
+    """Native day loop of the simulation for one product.
+
+    Updates qty, waste and inventory_delta (one column per produced batch,
+    batch_col maps production day to column) in place and writes one
+    (day, distributor index, batch day, quantity) row per purchase into
+    out_rows. Distributors must be in precedence order. Returns the row count.
+    """
+    n_rows = 0
+    for current_day in event_days:
+        # Add new batch if produced today
+        if prod_qty[current_day] > 0:
+            qty[current_day] = prod_qty[current_day]
+            inventory_delta[2 * current_day - 2, batch_col[current_day]] = qty[current_day]
+
+        # Remove expired batch at end of its expiry day
+        expired_day = current_day - shelf_life + 1
+        if expired_day >= 1 and qty[expired_day] > 0:
+            waste[expired_day] = qty[expired_day]
+            inventory_delta[2 * current_day - 1, batch_col[expired_day]] = -qty[expired_day]
+            qty[expired_day] = 0
+
+        for i in range(dist_policy.shape[0]):
+            if not dist_buy[i, current_day - 1]:
+                continue
+
+            # Valid batches: age < policy AND still in inventory
+            window_start = max(1, current_day - dist_policy[i] + 1)
+            total_available = 0
+            last_day = 0
+            for p_day in range(window_start, current_day + 1):
+                if qty[p_day] > 0:
+                    total_available += qty[p_day]
+                    last_day = p_day
+            if total_available == 0:
+                continue
+
+            # Distribute purchase across valid batches in proportion to stock,
+            # never exceeding a batch or the running total; the last batch takes the remainder
+            total_purchase = np.int64(np.rint(dist_prop[i] * total_available))
+            remaining_purchase = total_purchase
+            for p_day in range(window_start, last_day + 1):
+                current = qty[p_day]
+                if current <= 0:
+                    continue
+                if p_day == last_day:
+                    share = min(remaining_purchase, current)
+                else:
+                    share = np.int64(np.rint(current / total_available * total_purchase))
+                    share = min(share, current, remaining_purchase)
+                if share > 0:
+                    qty[p_day] -= share
+                    remaining_purchase -= share
+                    inventory_delta[2 * current_day - 1, batch_col[p_day]] -= share
+                    out_rows[n_rows, 0] = current_day
+                    out_rows[n_rows, 1] = i
+                    out_rows[n_rows, 2] = p_day
+                    out_rows[n_rows, 3] = share
+                    n_rows += 1
+    return n_rows
+
+
+_compiled_sim_kernel = None
+
+
+def _get_sim_kernel():
+    """_sim_kernel compiled with numba, which is imported on the first simulation"""
+    global _compiled_sim_kernel
+    if _compiled_sim_kernel is None:
+        from numba import njit
+        _compiled_sim_kernel = njit(cache=True)(_sim_kernel)
+    return _compiled_sim_kernel
+
+
+def _simulate_product(prod_name, prod_data, distributors, sim_days, transport_rate):
+    """Simulate one product's batches over the horizon.
+
+    Args:
+        distributors: distributors in precedence order, prepared by
+            PerishableSupplyChain.run_simulation (with '_active' and '_preferred_set')
+
+    Returns:
+        (prod_name, result dict, transport cost) so it can run in a worker process
+    """
+    shelf_life = prod_data['shelf_life']
+    production_plan = prod_data['production_plan']
+    total_days = sim_days
+
+    # Batch state as arrays indexed by production day (index 0 unused); quantities
+    # are whole units, and everything reported below is derived from prod_qty
+    prod_qty = np.zeros(total_days + 1, dtype=np.int64)
+    for p_day, p_qty in production_plan.items():
+        if 1 <= p_day <= total_days and p_qty > 0:
+            prod_qty[p_day] = p_qty
+    produced_days = np.flatnonzero(prod_qty)
+    qty = np.zeros(total_days + 1, dtype=np.int64)
+    waste = np.zeros(total_days + 1, dtype=np.int64)
+    # Net change per produced batch: row 2*(day-1) is the start phase, 2*day-1 the end phase
+    inventory_delta = np.zeros((2 * total_days, produced_days.size), dtype=np.int32)
+    batch_col = np.full(total_days + 1, -1, dtype=np.int64)
+    batch_col[produced_days] = np.arange(produced_days.size)
+
+    dist_names = np.array([dist['name'] for dist in distributors], dtype=object)
+    dist_policy = np.array([dist['policy_days'] for dist in distributors], dtype=np.int64)
+    dist_prop = np.array([dist['proportion'] for dist in distributors], dtype=np.float64)
+    dist_distance = np.array([dist['distance_km'] for dist in distributors], dtype=np.int64)
+
+    # Event calendar: inventory only changes on production, expiry and purchase days,
+    # so all other days are skipped. dist_buy[i, day - 1] marks the days distributor i
+    # buys this product and some batch is inside its buy window.
+    dist_buy = np.zeros((len(distributors), total_days), dtype=np.bool_)
+    for i, dist in enumerate(distributors):
+        # Skip if distributor doesn't carry this product
+        if prod_name not in dist['_preferred_set']:
+            continue
+        # A batch can be bought from its production day until it ages past
+        # the policy window or expires, whichever comes first
+        buy_window = min(dist['policy_days'], shelf_life - 1)
+        if buy_window <= 0 or produced_days.size == 0:
+            continue
+        in_window = np.zeros(total_days + 2, dtype=np.int64)
+        np.add.at(in_window, produced_days, 1)
+        np.add.at(in_window, np.minimum(produced_days + buy_window, total_days + 1), -1)
+        dist_buy[i] = (np.cumsum(in_window)[1:total_days + 1] > 0) & dist['_active']
+
+    expiry_days = produced_days + shelf_life - 1
+    event_days = np.union1d(np.union1d(produced_days, expiry_days[expiry_days <= total_days]),
+                            np.flatnonzero(dist_buy.any(axis=0)) + 1)
+
+    # Each purchase event fills at most one row per batch in the policy window
+    max_rows = int(sum(dist_buy[i].sum() * min(dist_policy[i], shelf_life) for i in range(len(distributors))))
+    out_rows = np.zeros((max_rows, 4), dtype=np.int64)
+    n_rows = _get_sim_kernel()(prod_qty, shelf_life, event_days, dist_policy, dist_prop, dist_buy,
+                               qty, waste, inventory_delta, batch_col, out_rows)
+
+    # Compile results
+    day, dist_idx, batch_day, quantity = out_rows[:n_rows].T
+    transport = quantity * dist_distance[dist_idx] * transport_rate
+    total_transport_cost = float(transport.sum())
+    purchases_df = pd.DataFrame({
+        'Product': np.full(n_rows, prod_name, dtype=object),
+        'Day': day,
+        'Distributor': dist_names[dist_idx],
+        'Batch_Day': batch_day,
+        'Quantity': quantity,
+        'Shelf_Age': day - batch_day,
+        'Policy': dist_policy[dist_idx],
+        'Proportion': dist_prop[dist_idx],
+        'Transport_Cost': transport
+    }, columns=PURCHASE_COLUMNS).astype(PURCHASE_DTYPES)
+
+    # Waste data: one row per day, zero where nothing was produced
+    initial = prod_qty[1:]
+    waste_pct = np.zeros(total_days)
+    np.divide(waste[1:], initial, out=waste_pct, where=initial > 0)
+    waste_pct = (waste_pct * 100).round(2)
+    waste_df = pd.DataFrame({
+        'Product': np.full(total_days, prod_name, dtype=object),
+        'Batch_Day': np.arange(1, total_days + 1, dtype=np.int32),
+        'Initial': initial.astype(np.int32),
+        'Waste': waste[1:].astype(np.int32),
+        'Waste_Pct': waste_pct,
+        'Waste_Pct_Display': pd.Series(waste_pct).map('{:.2f}%'.format)
+    }, columns=WASTE_COLUMNS)
+
+    # Batch pivot table
+    if not purchases_df.empty:
+        pivot = (purchases_df.groupby(['Distributor', 'Batch_Day'], sort=True)['Quantity'].sum()
+                 .astype(np.int32)
+                 .unstack('Batch_Day', fill_value=0)
+                 .reindex(columns=pd.Index(np.arange(1, total_days + 1, dtype=np.int32), name='Batch_Day'),
+                          fill_value=0))
+    else:
+        pivot = pd.DataFrame()
+
+    # Inventory log: start/end snapshots rebuilt from the deltas, one column per
+    # batch that was ever live, blank when not in stock
+    log_cols = np.flatnonzero(inventory_delta[0::2].sum(axis=0))
+    log_qty = np.cumsum(inventory_delta[:, log_cols], axis=0, dtype=np.int64)
+    inventory_df = pd.DataFrame(np.where(log_qty > 0, log_qty, np.nan),
+                                columns=[f'Q{b_day}' for b_day in produced_days[log_cols]])
+    inventory_df.insert(0, 'Day', np.repeat(np.arange(1, total_days + 1), 2))
+    inventory_df.insert(1, 'Phase', ['Start', 'End'] * total_days)
+
+    result = {
+        'purchases': purchases_df,
+        'waste': waste_df,
+        'batch_pivot': pivot,
+        'inventory_log': inventory_df
+    }
+    return prod_name, result, total_transport_cost
+
+
+def _process_pool(n_tasks):
+    """Worker pool for n_tasks independent jobs, or None when it can't pay off
+
+    Workers are spawned rather than forked: the callers run inside a Tk
+    process, sometimes on a background thread.
+    """
+    workers = min(n_tasks, os.cpu_count() or 1)
+    if workers < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _lp_solver(pl, use_highs=False):
+    """HiGHS when requested and installed, otherwise PuLP's bundled CBC"""
+    if use_highs:
+        solver = pl.HiGHS_CMD(msg=False)
+        if solver.available():
+            return solver
+    return pl.PULP_CBC_CMD(msg=False)
+
+
+def _plan_frame(plan, value_column):
+    """Two-column frame of a {day: quantity} production plan"""
+    return pd.DataFrame({
+        'Day': np.fromiter(plan.keys(), dtype=np.int32, count=len(plan)),
+        value_column: np.fromiter(plan.values(), dtype=np.int64, count=len(plan)),
+    })
+
+
+def _distinct_names(stems, max_len=None):
+    """Append the 1-based position to stems that collide (ignoring case)"""
+    counts = {}
+    for stem in stems:
+        counts[stem.lower()] = counts.get(stem.lower(), 0) + 1
+    names = []
+    for i, stem in enumerate(stems, start=1):
+        if counts[stem.lower()] > 1:
+            tag = f"_{i}"
+            stem = (stem if max_len is None else stem[:max_len - len(tag)]) + tag
+        names.append(stem)
+    return names
+
+
+def _product_filenames(names):
+    """Safe, distinct workbook file names for product names, in the same order
+
+    Path separators and characters Windows reserves become '_' and leading dots
+    are dropped, so a name can't point outside the export folder.
+    """
+    stems = [re.sub(r'[\x00-\x1f<>:"/\\|?*]', '_', str(name)).lstrip('.').rstrip('. ') or 'product'
+             for name in names]
+    return [f"{stem}.xlsx" for stem in _distinct_names(stems)]
+
+
+def _sheet_stems(names):
+    """Distinct product parts of sheet names, in the same order
+
+    Excel rejects []:*?/\\ in sheet names and caps them at 31 characters; 21
+    leaves room for the longest affix ('Inventory_' / '_Optimized').
+    """
+    stems = [re.sub(r'[\[\]:*?/\\]', '_', str(name)).strip("'")[:21] or 'product' for name in names]
+    return _distinct_names(stems, max_len=21)
+
+
+def _write_product_workbook(file_path, sheet_stem, batch_pivot, inventory_log):
+    """Write one product's Batch and Inventory sheets to their own workbook"""
+    with pd.ExcelWriter(file_path, engine=EXCEL_ENGINE) as writer:
+        if not batch_pivot.empty:
+            batch_pivot.to_excel(writer, sheet_name=f'Batch_{sheet_stem}', index=True)
+        inventory_log.to_excel(writer, sheet_name=f'Inventory_{sheet_stem}', index=False)
+    return file_path
 
 
 class PerishableSupplyChain:
@@ -11,7 +310,8 @@ class PerishableSupplyChain:
         """
         Args:
             products: dict {product_name: {'shelf_life': int, 'production_plan': dict}}
-            distributors: list of dict with name, policy_days, proportion, distance_km, purchase_days, preferred_products
+            distributors: list of dict with name, policy_days, proportion, distance_km, purchase_days
+                (bool array/list, one entry per simulation day), preferred_products
             transport_rate: $/km/unit
             sim_days_override: total simulation days
         """
@@ -28,223 +328,86 @@ class PerishableSupplyChain:
         self.all_results = {}
         self.total_transport_cost = 0.0
         self.total_waste_cost = 0.0
+        total_days = self.sim_days_override
+
+        # Process distributors in priority order (by policy_days) - PRECEDENCE RELATIONSHIP.
+        # Purchase days (minus Sundays) and product preferences are fixed for the run.
+        self._sorted_dists = []
+        for dist in sorted(self.distributors, key=lambda x: x['policy_days']):
+            active = np.zeros(total_days, dtype=bool)
+            n_days = min(len(dist['purchase_days']), total_days)
+            active[:n_days] = dist['purchase_days'][:n_days]
+            active[6::7] = False
+            self._sorted_dists.append(dict(dist, _active=active, _preferred_set=set(dist['preferred_products'])))
+
+        # Products are independent, so large multi-product runs are simulated in parallel
+        args = [(prod_name, prod_data, self._sorted_dists, total_days, self.transport_rate)
+                for prod_name, prod_data in self.products.items()]
+        pool = None
+        if len(args) > 1 and len(args) * total_days >= PARALLEL_SIM_MIN_PRODUCT_DAYS:
+            pool = _process_pool(len(args))
+        if pool is None:
+            outcomes = [_simulate_product(*a) for a in args]
+        else:
+            with pool:
+                outcomes = list(pool.map(_simulate_product, *zip(*args)))
 
-        for prod_name, prod_data in self.products.items():
-            shelf_life = prod_data['shelf_life']
-            production_plan = prod_data['production_plan']
-            total_days = self.sim_days_override
-
-            batches = {}
-            purchases = []
-            inventory_log = []
-            waste = {}
-
-            # Simulate day-by-day
-            for current_day in range(1, total_days + 1):
-                # Add new batch if produced today
-                if current_day in production_plan and production_plan[current_day] > 0:
-                    qty = production_plan[current_day]
-                    batches[current_day] = {
-                        'initial': qty,
-                        'current': qty,
-                        'expiry': current_day + shelf_life - 1
-                    }
-
-                # Log inventory at start
-                log_entry = {'Day': current_day, 'Phase': 'Start'}
-                for b_day in sorted(batches.keys()):
-                    log_entry[f'Q{b_day}'] = int(batches[b_day]['current'])
-                inventory_log.append(log_entry)
-
-                # Remove expired batches at end of their expiry day
-                expired_days = [p_day for p_day, b in list(batches.items()) if b['expiry'] == current_day]
-                for p_day in expired_days:
-                    final_qty = batches[p_day]['current']
-                    waste[p_day] = final_qty
-                    del batches[p_day]
-
-                # Process distributors in priority order (by policy_days) - PRECEDENCE RELATIONSHIP
-                sorted_distributors = sorted(self.distributors, key=lambda x: x['policy_days'])
-                
-                for dist in sorted_distributors:
-                    # Skip if distributor doesn't carry this product
-                    if prod_name not in dist['preferred_products']:
-                        continue
-                        
-                    dist_name = dist['name']
-                    policy = dist['policy_days']
-                    proportion = round(dist['proportion'], 2)
-                    distance = dist['distance_km']
-
-                    # Skip if not a purchase day or it's Sunday
-                    if (current_day > len(dist['purchase_days']) or 
-                        not dist['purchase_days'][current_day - 1] or 
-                        current_day % 7 == 0):
-                        continue
-
-                    # Valid batches: age < policy AND still in inventory
-                    valid_batches = {
-                        p_day: b for p_day, b in batches.items()
-                        if (current_day - p_day) < policy and b['current'] > 0
-                    }
-
-                    if not valid_batches:
-                        continue
-
-                    # Total available from valid batches
-                    total_available = sum(b['current'] for b in valid_batches.values())
-                    total_purchase = int(round(proportion * total_available))
-
-                    # Distribute purchase across valid batches
-                    remaining_purchase = total_purchase
-                    sorted_batches = sorted(valid_batches.items(), key=lambda x: x[0])
-
-                    for p_day, batch in sorted_batches[:-1]:
-                        share = int(round((batch['current'] / total_available) * total_purchase))
-                        share = min(share, batch['current'], remaining_purchase)
-                        batch['current'] -= share
-                        remaining_purchase -= share
-
-                        if share > 0:
-                            transport_cost = share * distance * self.transport_rate
-                            self.total_transport_cost += transport_cost
-                            
-                            purchases.append({
-                                'Product': prod_name,
-                                'Day': current_day,
-                                'Distributor': dist_name,
-                                'Batch_Day': p_day,
-                                'Quantity': share,
-                                'Shelf_Age': current_day - p_day,
-                                'Policy': policy,
-                                'Proportion': proportion,
-                                'Transport_Cost': transport_cost
-                            })
-
-                    # Give remainder to last batch
-                    if sorted_batches:
-                        p_day, batch = sorted_batches[-1]
-                        final_share = min(remaining_purchase, batch['current'])
-                        batch['current'] -= final_share
-
-                        if final_share > 0:
-                            transport_cost = final_share * distance * self.transport_rate
-                            self.total_transport_cost += transport_cost
-                            
-                            purchases.append({
-                                'Product': prod_name,
-                                'Day': current_day,
-                                'Distributor': dist_name,
-                                'Batch_Day': p_day,
-                                'Quantity': final_share,
-                                'Shelf_Age': current_day - p_day,
-                                'Policy': policy,
-                                'Proportion': proportion,
-                                'Transport_Cost': transport_cost
-                            })
-
-                    # Remove empty batches
-                    for p_day in list(valid_batches.keys()):
-                        if batches[p_day]['current'] <= 0:
-                            del batches[p_day]
-
-                # Log after transactions
-                log_entry = {'Day': current_day, 'Phase': 'End'}
-                for b_day in sorted(batches.keys()):
-                    log_entry[f'Q{b_day}'] = int(batches[b_day]['current'])
-                inventory_log.append(log_entry)
-
-            # Compile results
-            purchases_df = pd.DataFrame(purchases)
-            
-            # Waste data
-            waste_data = []
-            for day in range(1, total_days + 1):
-                initial = production_plan.get(day, 0)
-                if initial > 0:
-                    expired = waste.get(day, 0)
-                    waste_pct = (expired / initial) * 100 if initial > 0 else 0
-                    waste_data.append({
-                        'Product': prod_name,
-                        'Batch_Day': day,
-                        'Initial': initial,
-                        'Waste': expired,
-                        'Waste_Pct': round(waste_pct, 2),
-                        'Waste_Pct_Display': f"{round(waste_pct, 2)}%"
-                    })
-                else:
-                    waste_data.append({
-                        'Product': prod_name,
-                        'Batch_Day': day,
-                        'Initial': 0,
-                        'Waste': 0,
-                        'Waste_Pct': 0.0,
-                        'Waste_Pct_Display': "0.00%"
-                    })
-            waste_df = pd.DataFrame(waste_data)
-
-            # Batch pivot table
-            if not purchases_df.empty:
-                pivot = purchases_df.pivot_table(
-                    index='Distributor',
-                    columns='Batch_Day',
-                    values='Quantity',
-                    aggfunc='sum',
-                    fill_value=0
-                ).round(0).astype(int)
-                # Ensure all days are present
-                for day in range(1, total_days + 1):
-                    if day not in pivot.columns:
-                        pivot[day] = 0
-                pivot = pivot[sorted(pivot.columns)]
-            else:
-                pivot = pd.DataFrame()
-
-            self.all_results[prod_name] = {
-                'purchases': purchases_df,
-                'waste': waste_df,
-                'batch_pivot': pivot,
-                'inventory_log': pd.DataFrame(inventory_log)
-            }
+        for prod_name, result, transport_cost in outcomes:
+            self.all_results[prod_name] = result
+            self.total_transport_cost += transport_cost
 
         return self.all_results
 
-    def optimize_production(self, sim_days, shelf_life):
-        """LP to recommend optimal production plan minimizing waste + transport"""
-        days = list(range(1, sim_days + 1))
-        x = pl.LpVariable.dicts("Produce", days, lowBound=0, cat='Integer')
-
-        prob = pl.LpProblem("Minimize_Total_Cost", pl.LpMinimize)
-
+    def _production_cost_coefficients(self, sim_days, distributors):
+        """Objective coefficient of producing one unit on each day (index 0 unused)"""
         # Constants
         transport_rate = 0.01  # $/km/unit
         waste_cost_per_unit = 1.0  # Assumed cost
 
-        # Objective: Minimize transport + estimated waste
-        total_cost = 0
-        for day in days:
-            # Estimate waste cost (10% of production as proxy)
-            total_cost += waste_cost_per_unit * x[day] * 0.1
+        # Each unit produced on `day` costs the waste proxy (10% of production) plus
+        # transport for every non-Sunday day within each distributor's policy window.
+        day_idx = np.arange(1, sim_days + 1)
+        non_sunday_cum = np.cumsum(np.r_[0, (day_idx % 7 != 0).astype(np.int64)])
+        coef = np.full(sim_days + 1, waste_cost_per_unit * 0.1)
+        for dist in distributors:
+            window_end = np.minimum(day_idx + dist['policy_days'], sim_days + 1) - 1
+            window_days = non_sunday_cum[window_end] - non_sunday_cum[day_idx - 1]
+            coef[1:] += window_days * dist['proportion'] * transport_rate
+        return coef
+
+    def optimize_production_all(self, sim_days, use_highs=False):
+        """Single LP over all products; returns {product: {day: quantity}}
+
+        Each product's transport term only counts the distributors that carry it.
+        Solving one model instead of one per product pays the solver startup once.
+        """
+        import pulp as pl
+
+        days = list(range(1, sim_days + 1))
+        prod_names = list(self.products.keys())
+        x = pl.LpVariable.dicts("Produce", (range(len(prod_names)), days), lowBound=0, cat='Integer')
 
-            # Transport cost for units bought from batch produced on `day`
-            for dist in self.distributors:
-                # Only if within policy window and not Sunday
-                for d in range(day, min(day + dist['policy_days'], sim_days + 1)):
-                    if d % 7 != 0:  # Not Sunday
-                        total_cost += x[day] * dist['proportion'] * transport_rate
+        prob = pl.LpProblem("Minimize_Total_Cost", pl.LpMinimize)
 
-        prob += total_cost
+        # Objective: Minimize transport + estimated waste
+        objective = []
+        for p, prod_name in enumerate(prod_names):
+            carriers = [dist for dist in self.distributors if prod_name in dist['preferred_products']]
+            coef = self._production_cost_coefficients(sim_days, carriers)
+            objective.extend(float(coef[day]) * x[p][day] for day in days)
+        prob += pl.lpSum(objective)
 
         # Constraint: No production on Sundays
-        for day in days:
-            if day % 7 == 0:
-                prob += x[day] == 0
+        for p in range(len(prod_names)):
+            for day in days:
+                if day % 7 == 0:
+                    prob += x[p][day] == 0
 
         # Solve
-        prob.solve(pl.PULP_CBC_CMD(msg=False))
+        prob.solve(_lp_solver(pl, use_highs))
 
-        recommendation = {day: int(x[day].varValue or 0) for day in days}
-        return recommendation
+        return {prod_name: {day: int(x[p][day].varValue or 0) for day in days}
+                for p, prod_name in enumerate(prod_names)}
 
 
 class SupplyChainApp:
@@ -264,8 +427,13 @@ class SupplyChainApp:
         self.distributors = []
         self.transport_rate = tk.DoubleVar(value=0.01)
         self.sim_days = tk.IntVar(value=28)
+        self.use_highs = tk.BooleanVar(value=False)
         self.all_results = {}
+        self._all_purchases_cached = None
+        self._all_waste_cached = None
         self.optimized_production = {}
+        self._sim_cache = OrderedDict()
+        self._opt_cache = OrderedDict()
         
         # StringVars for entry widgets
         self.prod_name_var = tk.StringVar()
@@ -316,39 +484,7 @@ class SupplyChainApp:
             }
 
     def create_widgets(self):
-        # Configure style
-        style = ttk.Style()
-        style.theme_use('clam')
-        
-        # Update colors based on theme
-        self.colors = self._get_redwood_colors()
-        
-        # Custom styles for Redwood theme
-        style.configure("TFrame", background=self.colors['frame_bg'])
-        style.configure("TLabel", background=self.colors['frame_bg'], foreground=self.colors['fg'], font=("Segoe UI", 10))
-        style.configure("TButton", 
-                       font=("Segoe UI", 9, "bold"), 
-                       padding=6,
-                       background=self.colors['button_bg'],
-                       foreground=self.colors['button_fg'])
-        style.map("TButton",
-                  foreground=[('pressed', 'white'), ('active', 'white')],
-                  background=[('pressed', '#9a0007'), ('active', '#b71c1c')])
-        
-        style.configure("Treeview", 
-                       background=self.colors['tree_bg'],
-                       fieldbackground=self.colors['tree_field'],
-                       foreground=self.colors['tree_text'],
-                       font=("Segoe UI", 9), 
-                       rowheight=24,
-                       borderwidth=0)
-        style.configure("Treeview.Heading", 
-                       font=("Segoe UI", 10, "bold"),
-                       background=self.colors['header_bg'],
-                       foreground='white')
-        style.map("Treeview", 
-                 background=[('selected', self.colors['accent'])],
-                 foreground=[('selected', 'white')])
+        self._apply_theme()
 
         # Header
         header_frame = tk.Frame(self.root, bg=self.colors['header_bg'], padx=20, pady=15)
@@ -476,6 +612,8 @@ class SupplyChainApp:
         
         self.prod_checkboxes = []
         self.prod_vars = []
+        self._prod_cb_widgets = {}  # product name -> (BooleanVar, Checkbutton)
+        self._prod_cb_cells = {}  # product name -> (row, column) in prod_grid_frame
         
         # Flexible day configuration for distributor
         self.days_config_frame = ttk.Frame(dist_frame)
@@ -551,8 +689,11 @@ class SupplyChainApp:
         btn_frame = ttk.Frame(setup_notebook)
         setup_notebook.add(btn_frame, text="Actions")
         
-        ttk.Button(btn_frame, text="Run Simulation", command=self.run_simulation).pack(pady=20, ipadx=20, ipady=10)
-        ttk.Button(btn_frame, text="Optimize Production", command=self.optimize_production).pack(pady=20, ipadx=20, ipady=10)
+        self.run_btn = ttk.Button(btn_frame, text="Run Simulation", command=self.run_simulation)
+        self.run_btn.pack(pady=20, ipadx=20, ipady=10)
+        self.optimize_btn = ttk.Button(btn_frame, text="Optimize Production", command=self.optimize_production)
+        self.optimize_btn.pack(pady=20, ipadx=20, ipady=10)
+        ttk.Checkbutton(btn_frame, text="Use HiGHS solver (falls back to CBC)", variable=self.use_highs).pack()
         ttk.Button(btn_frame, text="Export Original Results", command=self.export_original_results).pack(pady=20, ipadx=20, ipady=10)
         ttk.Button(btn_frame, text="Export Optimized Plan", command=self.export_optimized_plan).pack(pady=20, ipadx=20, ipady=10)
         ttk.Button(btn_frame, text="Export All", command=self.export_all).pack(pady=20, ipadx=20, ipady=10)
@@ -573,10 +714,77 @@ class SupplyChainApp:
         viz_frame = ttk.Frame(results_notebook)
         results_notebook.add(viz_frame, text="Charts")
         self.viz_canvas = None
+        self._fig = None
+        self._axes = None
         self.viz_frame = viz_frame
+
+        # Result tabs are filled only when shown; keyed by tab widget path
+        self.results_notebook = results_notebook
+        self._tab_renderers = {
+            str(self.purchases_table.master): self._render_purchases,
+            str(self.waste_table.master): self._render_waste,
+            str(self.batch_table.master): self._render_batch,
+            str(self.inventory_table.master): self._render_inventory,
+            str(viz_frame): self._plot_results,
+        }
+        self._pending_tabs = set()
+        results_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
         self.update_ui()
 
+    def _apply_theme(self):
+        """Apply the current color scheme to ttk styles and existing tk widgets in place"""
+        # Configure style
+        style = ttk.Style()
+        style.theme_use('clam')
+        
+        # Update colors based on theme
+        self.colors = self._get_redwood_colors()
+        
+        # Custom styles for Redwood theme
+        style.configure("TFrame", background=self.colors['frame_bg'])
+        style.configure("TLabel", background=self.colors['frame_bg'], foreground=self.colors['fg'], font=("Segoe UI", 10))
+        style.configure("TButton", 
+                       font=("Segoe UI", 9, "bold"), 
+                       padding=6,
+                       background=self.colors['button_bg'],
+                       foreground=self.colors['button_fg'])
+        style.map("TButton",
+                  foreground=[('pressed', 'white'), ('active', 'white')],
+                  background=[('pressed', '#9a0007'), ('active', '#b71c1c')])
+        
+        style.configure("Treeview", 
+                       background=self.colors['tree_bg'],
+                       fieldbackground=self.colors['tree_field'],
+                       foreground=self.colors['tree_text'],
+                       font=("Segoe UI", 9), 
+                       rowheight=24,
+                       borderwidth=0)
+        style.configure("Treeview.Heading", 
+                       font=("Segoe UI", 10, "bold"),
+                       background=self.colors['header_bg'],
+                       foreground='white')
+        style.map("Treeview", 
+                 background=[('selected', self.colors['accent'])],
+                 foreground=[('selected', 'white')])
+
+        # Plain tk widgets carry their own colors
+        self._recolor_widgets(self.root)
+
+    def _recolor_widgets(self, parent):
+        """Recursively recolor tk (non-ttk) widgets: header widgets and listboxes"""
+        for widget in parent.winfo_children():
+            widget_class = widget.winfo_class()
+            try:
+                if widget_class == 'Listbox':
+                    widget.configure(bg=self.colors['entry_bg'], fg=self.colors['entry_fg'],
+                                     selectbackground=self.colors['accent'])
+                elif widget_class in ('Frame', 'Label', 'Button'):
+                    widget.configure(bg=self.colors['header_bg'])
+            except tk.TclError:
+                pass
+            self._recolor_widgets(widget)
+
     def _create_tab(self, parent, title):
         frame = ttk.Frame(parent)
         parent.add(frame, text=title)
@@ -597,12 +805,9 @@ class SupplyChainApp:
 
     def toggle_theme(self):
         self.is_dark_mode = not self.is_dark_mode
-        self.colors = self._get_redwood_colors()
         self.update_theme_button_text()
-        # Recreate the entire UI with new theme
-        for widget in self.root.winfo_children():
-            widget.destroy()
-        self.create_widgets()
+        # Restyle in place so entered data and results are kept
+        self._apply_theme()
 
     def apply_settings(self):
         """Apply settings without recreating the whole UI"""
@@ -615,23 +820,25 @@ class SupplyChainApp:
         if self.products:
             self.prod_combo.set(list(self.products.keys())[0])
         
-        # Update product checkboxes
-        for var in self.prod_vars:
-            var.set(False)
-        self.prod_vars.clear()
-        self.prod_checkboxes.clear()
-        
-        # Clear existing product grid
-        for widget in self.prod_grid_frame.winfo_children():
-            widget.destroy()
-            
-        # Create product checkboxes in a grid
-        for i, prod_name in enumerate(self.products.keys()):
+        # Update product checkboxes: only create/destroy the ones for added/removed products
+        for prod_name in self._prod_cb_widgets.keys() - self.products.keys():
+            self._prod_cb_widgets.pop(prod_name)[1].destroy()
+            del self._prod_cb_cells[prod_name]
+        for prod_name in self.products:
+            if prod_name in self._prod_cb_widgets:
+                continue
             var = tk.BooleanVar()
-            self.prod_vars.append(var)
             cb = ttk.Checkbutton(self.prod_grid_frame, text=prod_name, variable=var)
-            cb.grid(row=i//5, column=i%5, sticky="w", padx=5, pady=2)
-            self.prod_checkboxes.append(cb)
+            self._prod_cb_widgets[prod_name] = (var, cb)
+
+        # Keep checkboxes in a grid in product order, re-gridding only those that moved
+        for i, prod_name in enumerate(self.products.keys()):
+            cell = (i // 5, i % 5)
+            if self._prod_cb_cells.get(prod_name) != cell:
+                self._prod_cb_widgets[prod_name][1].grid(row=cell[0], column=cell[1], sticky="w", padx=5, pady=2)
+                self._prod_cb_cells[prod_name] = cell
+        self.prod_vars = [self._prod_cb_widgets[p][0] for p in self.products]
+        self.prod_checkboxes = [self._prod_cb_widgets[p][1] for p in self.products]
 
         # Update product listbox
         self.prod_listbox.delete(0, tk.END)
@@ -660,6 +867,7 @@ class SupplyChainApp:
             return messagebox.showwarning("Duplicate", f"Product '{name}' already exists.")
             
         self.products[name] = {'shelf_life': sl, 'production_plan': {}}
+        self._invalidate_caches()
         self.prod_name_var.set("")
         self.prod_shelf_life_var.set("")
         self.update_ui()
@@ -679,6 +887,7 @@ class SupplyChainApp:
             self.prod_listbox.delete(idx)
             if prod_name in self.products:
                 del self.products[prod_name]
+            self._invalidate_caches()
             self.update_ui()
             messagebox.showinfo("Success", f"Product '{prod_name}' has been removed.")
 
@@ -689,6 +898,7 @@ class SupplyChainApp:
             
         if messagebox.askyesno("Clear All", "Are you sure you want to remove ALL products? This cannot be undone."):
             self.products.clear()
+            self._invalidate_caches()
             self.prod_listbox.delete(0, tk.END)
             self.update_ui()
             messagebox.showinfo("Success", "All products have been cleared.")
@@ -712,20 +922,16 @@ class SupplyChainApp:
             return messagebox.showerror("Error", "Invalid numeric values.")
             
         # Get selected products
-        selected_products = []
-        for i, var in enumerate(self.prod_vars):
-            if var.get():
-                selected_products.append(list(self.products.keys())[i])
+        prod_names = list(self.products.keys())
+        selected_products = [prod_names[i] for i, var in enumerate(self.prod_vars) if var.get()]
                 
         if not selected_products:
             return messagebox.showwarning("Selection", "Select at least one product for this distributor.")
             
-        # Create purchase_days array for full simulation period
-        purchase_pattern = [var.get() for var in self.day_vars]  # Weekly pattern (Mon-Sun)
-        full_purchase_days = []
-        for day in range(1, self.sim_days.get() + 1):
-            weekday_index = (day - 1) % 7  # 0=Mon, 1=Tue, ..., 6=Sun
-            full_purchase_days.append(purchase_pattern[weekday_index])
+        # Create purchase_days array for full simulation period (day 1 is a Monday)
+        purchase_pattern = np.array([var.get() for var in self.day_vars], dtype=np.bool_)  # Weekly pattern (Mon-Sun)
+        full_purchase_days = np.resize(purchase_pattern, self.sim_days.get())
+        full_purchase_days[6::7] = False  # No purchases on Sundays
             
         self.distributors.append({
             'name': name,
@@ -735,6 +941,7 @@ class SupplyChainApp:
             'purchase_days': full_purchase_days,
             'preferred_products': selected_products
         })
+        self._invalidate_caches()
         
         self.dist_name_var.set("")
         self.dist_policy_var.set("1")
@@ -742,8 +949,8 @@ class SupplyChainApp:
         self.dist_dist_var.set("10")
         for var in self.prod_vars:
             var.set(False)
-        for var in self.day_vars:
-            var.set(True if self.day_vars.index(var) < 6 else False)  # Reset to default (Mon-Sat)
+        for i, var in enumerate(self.day_vars):
+            var.set(i < 6)  # Reset to default (Mon-Sat)
             
         self.update_ui()
 
@@ -760,6 +967,7 @@ class SupplyChainApp:
             self.dist_listbox.delete(idx)
             if idx < len(self.distributors):
                 del self.distributors[idx]
+            self._invalidate_caches()
             self.update_ui()
             messagebox.showinfo("Success", f"Distributor '{dist_name}' has been removed.")
 
@@ -770,6 +978,7 @@ class SupplyChainApp:
             
         if messagebox.askyesno("Clear All", "Are you sure you want to remove ALL distributors? This cannot be undone."):
             self.distributors.clear()
+            self._invalidate_caches()
             self.dist_listbox.delete(0, tk.END)
             self.update_ui()
             messagebox.showinfo("Success", "All distributors have been cleared.")
@@ -790,11 +999,14 @@ class SupplyChainApp:
             
             if day < 1 or qty < 0:
                 raise ValueError("Invalid input")
+            if not qty.is_integer():
+                raise ValueError("Quantity must be a whole number of units.")
+            qty = int(qty)
             if prod_name not in self.products:
                 return messagebox.showerror("Error", "Product not found.")
                 
             self.products[prod_name]['production_plan'][day] = qty
-            self.prod_tree.insert("", "end", values=(prod_name, day, int(qty)))
+            self.prod_tree.insert("", "end", values=(prod_name, day, qty))
             self.prod_day_var.set("")
             self.prod_qty_var.set("")
         except Exception as e:
@@ -805,89 +1017,160 @@ class SupplyChainApp:
         if not selected:
             return messagebox.showwarning("Selection", "Please select a production entry to remove.")
             
-        for item in selected:
-            values = self.prod_tree.item(item, "values")
-            prod_name, day = values[0], int(values[1])
-            if prod_name in self.products and day in self.products[prod_name]['production_plan']:
-                del self.products[prod_name]['production_plan'][day]
-            self.prod_tree.delete(item)
+        entries = [(self.prod_tree.set(item, "product"), int(self.prod_tree.set(item, "day"))) for item in selected]
+        for prod_name, day in entries:
+            if prod_name in self.products:
+                self.products[prod_name]['production_plan'].pop(day, None)
+        self.prod_tree.delete(*selected)
 
     def run_simulation(self):
         if not self.products:
             return messagebox.showerror("Error", "Add at least one product.")
-        for p, data in self.products.items():
-            if not data['production_plan']:
-                return messagebox.showerror("Error", f"Add production for {p}.")
+        empty = [p for p, data in self.products.items() if not data['production_plan']]
+        if empty:
+            return messagebox.showerror("Error", f"Add production for {', '.join(empty)}.")
         if not self.distributors:
             return messagebox.showerror("Error", "Add at least one distributor.")
 
-        model = PerishableSupplyChain(
-            products=self.products,
-            distributors=self.distributors,
-            transport_rate=self.transport_rate.get(),
-            sim_days_override=self.sim_days.get()
-        )
+        try:
+            key = self._cache_key()
+            # The worker gets its own copy so edits made while it runs can't race it
+            model = PerishableSupplyChain(
+                products=copy.deepcopy(self.products),
+                distributors=copy.deepcopy(self.distributors),
+                transport_rate=self.transport_rate.get(),
+                sim_days_override=self.sim_days.get()
+            )
+        except Exception as e:
+            return messagebox.showerror("Error", f"Simulation failed: {str(e)}")
+
+        cached = self._cache_get(self._sim_cache, key)
+        if cached is not None:
+            return self._on_simulation_done(key, cached)
+
+        # Run the model off the Tk thread; results are handed back through root.after
+        def _worker():
+            try:
+                results = model.run_simulation()
+            except Exception as e:
+                self.root.after(0, self._on_simulation_failed, e)
+            else:
+                self.root.after(0, self._on_simulation_done, key, results)
+
+        self.run_btn.config(state="disabled")
+        threading.Thread(target=_worker, daemon=True).start()
 
+    def _on_simulation_done(self, key, results):
+        """Show simulation results (runs on the Tk thread)"""
+        self.run_btn.config(state="normal")
+        self._cache_put(self._sim_cache, key, results)
         try:
-            self.all_results = model.run_simulation()
+            self.all_results = results
+            self._combine_results()
             self.display_results()
             messagebox.showinfo("Success", "Simulation completed successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Simulation failed: {str(e)}")
 
+    def _on_simulation_failed(self, error):
+        self.run_btn.config(state="normal")
+        messagebox.showerror("Error", f"Simulation failed: {str(error)}")
+
+    def _combine_results(self):
+        """Concatenate purchases and waste across products once per simulation run"""
+        purchases = [data['purchases'] for data in self.all_results.values() if not data['purchases'].empty]
+        self._all_purchases_cached = (pd.concat(purchases, ignore_index=True) if purchases
+                                      else pd.DataFrame(columns=PURCHASE_COLUMNS))
+        self._all_waste_cached = pd.concat([data['waste'] for data in self.all_results.values()], ignore_index=True)
+        # Few distinct products repeated on every row: group/plot on integer codes
+        self._all_purchases_cached['Product'] = self._all_purchases_cached['Product'].astype('category')
+        self._all_waste_cached['Product'] = self._all_waste_cached['Product'].astype('category')
+
     def display_results(self):
-        # Combine all purchases
-        all_purchases = []
-        for prod, data in self.all_results.items():
-            df = data['purchases']
-            if not df.empty:
-                all_purchases.append(df)
-        if all_purchases:
-            full_purchases = pd.concat(all_purchases, ignore_index=True)
-            self._populate_table(self.purchases_table, full_purchases)
+        """Mark all result tabs stale and render the one currently shown"""
+        for table in (self.purchases_table, self.waste_table, self.batch_table, self.inventory_table):
+            self._clear_table(table)
+        self._pending_tabs = set(self._tab_renderers)
+        self._on_tab_changed()
+
+    def _on_tab_changed(self, event=None):
+        """Render the selected result tab if it has not been filled since the last run"""
+        tab = str(self.results_notebook.select())
+        if tab in self._pending_tabs:
+            self._pending_tabs.discard(tab)
+            self._tab_renderers[tab]()
+
+    def _render_purchases(self):
+        if not self._all_purchases_cached.empty:
+            self._populate_table(self.purchases_table, self._all_purchases_cached)
         else:
             self._clear_table(self.purchases_table)
 
-        # Combine all waste
-        all_waste = pd.concat([data['waste'] for data in self.all_results.values()], ignore_index=True)
-        self._populate_table(self.waste_table, all_waste)
+    def _render_waste(self):
+        self._populate_table(self.waste_table, self._all_waste_cached)
 
+    def _render_batch(self):
         # First product's batch pivot
         if self.all_results:
-            first_prod = list(self.all_results.keys())[0]
+            first_prod = next(iter(self.all_results))
             df = self.all_results[first_prod]['batch_pivot']
             if not df.empty:
                 self._populate_table(self.batch_table, df.reset_index())
             else:
                 self._clear_table(self.batch_table)
 
+    def _render_inventory(self):
+        # First product's inventory log
+        if self.all_results:
+            first_prod = next(iter(self.all_results))
             inv_log = self.all_results[first_prod]['inventory_log']
             self._populate_table(self.inventory_table, inv_log)
 
-        self._plot_results()
-
     def optimize_production(self):
         """Generate optimized production plan using LP"""
         if not self.products or not self.distributors:
             return messagebox.showwarning("Setup", "Add products and distributors first.")
             
         try:
-            # Use first product for optimization
-            first_prod = list(self.products.keys())[0]
-            shelf_life = self.products[first_prod]['shelf_life']
             sim_days = self.sim_days.get()
+            use_highs = self.use_highs.get()
             
             model = PerishableSupplyChain(
-                products=self.products,
-                distributors=self.distributors,
+                products=copy.deepcopy(self.products),
+                distributors=copy.deepcopy(self.distributors),
                 transport_rate=self.transport_rate.get(),
                 sim_days_override=sim_days
             )
+            key = self._optimization_key(use_highs)
+        except Exception as e:
+            return messagebox.showerror("Error", f"Optimization failed: {str(e)}")
+
+        recs = self._cache_get(self._opt_cache, key)
+        if recs is not None:
+            return self._on_optimization_done(key, recs)
+
+        # Solve the LP off the Tk thread; the plan is handed back through root.after
+        def _worker():
+            try:
+                recs = model.optimize_production_all(sim_days, use_highs)
+            except Exception as e:
+                self.root.after(0, self._on_optimization_failed, e)
+            else:
+                self.root.after(0, self._on_optimization_done, key, recs)
+
+        self.optimize_btn.config(state="disabled")
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def _on_optimization_done(self, key, recs):
+        """Show the recommended plans (runs on the Tk thread)"""
+        self.optimize_btn.config(state="normal")
+        self._cache_put(self._opt_cache, key, recs)
+        try:
+            self.optimized_production = recs
             
-            rec = model.optimize_production(sim_days, shelf_life)
-            self.optimized_production = {first_prod: rec}
-            
-            lp_df = pd.DataFrame(list(rec.items()), columns=["Day", "Recommended Production"])
+            lp_df = pd.concat(
+                {prod_name: _plan_frame(rec, "Recommended Production") for prod_name, rec in recs.items()},
+                names=["Product"]).reset_index(level="Product")
             self._populate_table(self.optimization_table, lp_df)
             
             messagebox.showinfo("Optimization", "Production optimization completed!")
@@ -895,6 +1178,44 @@ class SupplyChainApp:
         except Exception as e:
             messagebox.showerror("Error", f"Optimization failed: {str(e)}")
 
+    def _on_optimization_failed(self, error):
+        self.optimize_btn.config(state="normal")
+        messagebox.showerror("Error", f"Optimization failed: {str(error)}")
+
+    def _cache_key(self):
+        """Digest of the current inputs, used to reuse simulation results"""
+        inputs = (self.products, self.distributors, self.transport_rate.get(), self.sim_days.get())
+        return hashlib.blake2b(pickle.dumps(inputs)).digest()
+
+    def _optimization_key(self, use_highs):
+        """Tuple of exactly the inputs the production LP reads
+
+        Production plans, shelf lives, purchase days and the UI transport rate
+        don't enter the LP, so editing them keeps earlier plans reusable.
+        """
+        dists = tuple((d['policy_days'], d['proportion'], tuple(d['preferred_products']))
+                      for d in self.distributors)
+        return (tuple(self.products), dists, self.sim_days.get(), use_highs)
+
+    def _cache_get(self, cache, key):
+        """Return cached result for key (marking it most recently used) or None"""
+        if key not in cache:
+            return None
+        cache.move_to_end(key)
+        return cache[key]
+
+    def _cache_put(self, cache, key, value):
+        """Store result, evicting the least recently used entries beyond RESULT_CACHE_SIZE"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > RESULT_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _invalidate_caches(self):
+        """Drop cached simulation results after products or distributors change"""
+        # Optimization results are keyed on every input the LP reads, so they stay valid
+        self._sim_cache.clear()
+
     def _populate_table(self, table, df):
         self._clear_table(table)
         if df.empty:
@@ -903,48 +1224,70 @@ class SupplyChainApp:
         for col in df.columns:
             table.heading(col, text=col)
             table.column(col, width=80, anchor="center")
-        for _, row in df.iterrows():
-            table.insert("", "end", values=[round(v, 2) if isinstance(v, float) else v for v in row])
+        # Round float columns in one NumPy pass, then insert plain Python rows
+        rows = df.to_numpy(dtype=object)
+        float_idx = np.flatnonzero([dtype.kind == 'f' for dtype in df.dtypes])
+        if len(float_idx):
+            rows[:, float_idx] = np.round(rows[:, float_idx].astype(np.float64), 2)
+        for row in rows.tolist():
+            table.insert("", "end", values=row)
 
     def _clear_table(self, table):
         for item in table.get_children():
             table.delete(item)
 
     def _plot_results(self):
-        if self.viz_canvas:
-            self.viz_canvas.get_tk_widget().destroy()
-
-        fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+        # Build the figure and canvas once; later runs just clear and redraw the axes
+        if self.viz_canvas is None:
+            # Imported on first plot so matplotlib stays off the startup path
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+            self._fig, self._axes = plt.subplots(2, 2, figsize=(12, 8))
+            self.viz_canvas = FigureCanvasTkAgg(self._fig, self.viz_frame)
+            self.viz_canvas.get_tk_widget().pack(fill="both", expand=True)
+        else:
+            for ax in self._axes.flat:
+                ax.clear()
+        fig, axes = self._fig, self._axes
         fig.suptitle("Simulation Results", fontsize=14)
 
         # Waste by batch
-        all_waste = pd.concat([data['waste'] for data in self.all_results.values()], ignore_index=True)
+        all_waste = self._all_waste_cached
         axes[0, 0].bar(all_waste['Batch_Day'], all_waste['Waste'], color='orangered')
         axes[0, 0].set_title("Waste by Batch")
         axes[0, 0].set_xlabel("Production Day")
 
-        # Waste distribution
-        axes[0, 1].pie(all_waste['Waste'], labels=all_waste['Batch_Day'], autopct='%1.1f%%')
+        # Waste distribution: the 12 most wasteful batches, the rest folded into "Other"
+        top = all_waste.nlargest(12, 'Waste')
+        top = top[top['Waste'] > 0]
+        wedges = top['Waste'].tolist()
+        labels = top['Batch_Day'].tolist()
+        other = all_waste['Waste'].sum() - top['Waste'].sum()
+        if other > 0:
+            wedges.append(other)
+            labels.append("Other")
+        if wedges:
+            axes[0, 1].pie(wedges, labels=labels, autopct='%1.1f%%')
         axes[0, 1].set_title("Waste Distribution (%)")
 
         # Total purchases by product
         if not all_waste.empty:
-            prod_sum = all_waste.groupby('Product')['Initial'].sum() - all_waste.groupby('Product')['Waste'].sum()
+            sums = all_waste.groupby('Product', sort=False, observed=True).agg(Initial=('Initial', 'sum'), Waste=('Waste', 'sum'))
+            prod_sum = sums['Initial'] - sums['Waste']
             axes[1, 0].bar(prod_sum.index, prod_sum.values, color='teal')
             axes[1, 0].set_title("Total Sales per Product")
 
         # Batch purchases
         if self.all_results:
-            first_prod = list(self.all_results.keys())[0]
+            first_prod = next(iter(self.all_results))
             batch = self.all_results[first_prod]['batch_pivot']
             if not batch.empty:
                 batch.T.plot(kind='bar', ax=axes[1, 1], legend=False)
                 axes[1, 1].set_title("Batch Purchases")
 
-        plt.tight_layout()
-        self.viz_canvas = FigureCanvasTkAgg(fig, self.viz_frame)
-        self.viz_canvas.draw()
-        self.viz_canvas.get_tk_widget().pack(fill="both", expand=True)
+        fig.tight_layout()
+        self.viz_canvas.draw_idle()
 
     def export_original_results(self):
         if not self.all_results:
@@ -958,8 +1301,11 @@ class SupplyChainApp:
         if not file_path:
             return
 
-        self._export_to_excel(file_path, include_optimized=False)
-        messagebox.showinfo("Export Success", f"Original results exported to:\n{os.path.basename(file_path)}")
+        product_paths = self._export_to_excel(file_path, include_optimized=False)
+        if product_paths is None:
+            return
+        messagebox.showinfo("Export Success",
+                            f"Original results exported to:\n{self._exported_files_text(file_path, product_paths)}")
 
     def export_optimized_plan(self):
         if not hasattr(self, 'optimized_production') or not self.optimized_production:
@@ -973,10 +1319,11 @@ class SupplyChainApp:
         if not file_path:
             return
 
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            for prod_name, plan in self.optimized_production.items():
-                df = pd.DataFrame(list(plan.items()), columns=["Day", "Recommended Quantity"])
-                df.to_excel(writer, sheet_name=f"{prod_name}_Optimized", index=False)
+        with pd.ExcelWriter(file_path, engine=EXCEL_ENGINE) as writer:
+            stems = _sheet_stems(self.optimized_production)
+            for stem, plan in zip(stems, self.optimized_production.values()):
+                df = _plan_frame(plan, "Recommended Quantity")
+                df.to_excel(writer, sheet_name=f"{stem}_Optimized", index=False)
 
         messagebox.showinfo("Export Success", f"Optimized plan exported to:\n{os.path.basename(file_path)}")
 
@@ -992,53 +1339,91 @@ class SupplyChainApp:
         if not file_path:
             return
 
-        self._export_to_excel(file_path, include_optimized=True)
-        messagebox.showinfo("Export Success", f"All results exported to:\n{os.path.basename(file_path)}")
+        product_paths = self._export_to_excel(file_path, include_optimized=True)
+        if product_paths is None:
+            return
+        messagebox.showinfo("Export Success",
+                            f"All results exported to:\n{self._exported_files_text(file_path, product_paths)}")
+
+    def _exported_files_text(self, file_path, product_paths):
+        """Main workbook name, then per-product workbooks relative to its folder"""
+        base_dir = os.path.dirname(os.path.abspath(file_path))
+        names = [os.path.basename(file_path)]
+        names += [os.path.relpath(os.path.abspath(p), base_dir) for p in product_paths]
+        return "\n".join(names)
 
     def _export_to_excel(self, file_path, include_optimized=True):
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        """Write the results workbook
+
+        Returns the paths of any per-product workbooks, or None if the user
+        declined to overwrite existing ones.
+        """
+        # Large multi-product runs are dominated by serializing the per-product sheets,
+        # so when a worker pool is worth it those go to separate workbooks written in parallel
+        product_files = {}
+        futures = []
+        pool = None
+        total_cells = sum(data['inventory_log'].size for data in self.all_results.values())
+        if len(self.all_results) > 1 and total_cells >= PARALLEL_EXPORT_MIN_CELLS:
+            pool = _process_pool(len(self.all_results))
+        if pool is not None:
+            product_dir = f"{os.path.splitext(file_path)[0]}_products"
+            product_files = {prod: os.path.join(product_dir, filename)
+                             for prod, filename in zip(self.all_results, _product_filenames(self.all_results))}
+            existing = [p for p in product_files.values() if os.path.exists(p)]
+            if existing and not messagebox.askyesno(
+                    "Overwrite Files",
+                    f"{len(existing)} per-product workbook(s) already exist in\n{product_dir}\nOverwrite them?"):
+                pool.shutdown()
+                return None
+            os.makedirs(product_dir, exist_ok=True)
+            futures = [pool.submit(_write_product_workbook, product_files[prod], stem,
+                                   data['batch_pivot'], data['inventory_log'])
+                       for stem, (prod, data) in zip(_sheet_stems(self.all_results), self.all_results.items())]
+
+        try:
+            self._write_results_workbook(file_path, include_optimized, write_products=not product_files)
+            for future in futures:
+                future.result()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return list(product_files.values())
+
+    def _write_results_workbook(self, file_path, include_optimized, write_products):
+        with pd.ExcelWriter(file_path, engine=EXCEL_ENGINE) as writer:
             # Purchases
-            all_purchases = []
-            for prod, data in self.all_results.items():
-                df = data['purchases']
-                if not df.empty:
-                    all_purchases.append(df)
-            if all_purchases:
-                pd.concat(all_purchases, ignore_index=True).to_excel(writer, sheet_name='Purchases', index=False)
+            if not self._all_purchases_cached.empty:
+                self._all_purchases_cached.to_excel(writer, sheet_name='Purchases', index=False)
 
             # Waste
-            all_waste = pd.concat([data['waste'] for data in self.all_results.values()], ignore_index=True)
-            all_waste.to_excel(writer, sheet_name='Waste Summary', index=False)
-
-            # Batch pivots
-            for prod, data in self.all_results.items():
-                if not data['batch_pivot'].empty:
-                    data['batch_pivot'].to_excel(writer, sheet_name=f'Batch_{prod}', index=True)
+            self._all_waste_cached.to_excel(writer, sheet_name='Waste Summary', index=False)
 
-            # Inventory logs
-            for prod, data in self.all_results.items():
-                data['inventory_log'].to_excel(writer, sheet_name=f'Inventory_{prod}', index=False)
+            # Batch pivots and inventory logs per product, totalling transport cost on the way
+            total_transport_cost = 0.0
+            for stem, data in zip(_sheet_stems(self.all_results), self.all_results.values()):
+                if write_products:
+                    if not data['batch_pivot'].empty:
+                        data['batch_pivot'].to_excel(writer, sheet_name=f'Batch_{stem}', index=True)
+                    data['inventory_log'].to_excel(writer, sheet_name=f'Inventory_{stem}', index=False)
+                total_transport_cost += data['purchases']['Transport_Cost'].sum()
 
             # Financial summary
             total_revenue = 0
             total_production_cost = 0
-            total_transport_cost = sum(p['purchases']['Transport_Cost'].sum() 
-                                     for p in self.all_results.values())
             
-            summary_data = [{
+            summary_df = pd.DataFrame({
                 'Metric': ['Total Transport Cost', 'Simulation Days'],
-                'Value': [
-                    f"{total_transport_cost:.2f}",
-                    self.sim_days.get()
-                ]
-            }]
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+                'Value': [round(float(total_transport_cost), 2), self.sim_days.get()]
+            })
+            summary_df.to_excel(writer, sheet_name='Summary', index=False)
 
             # Optimized production if requested
             if include_optimized and hasattr(self, 'optimized_production'):
-                for prod_name, plan in self.optimized_production.items():
-                    df = pd.DataFrame(list(plan.items()), columns=["Day", "Recommended Quantity"])
-                    df.to_excel(writer, sheet_name=f"Optimal_{prod_name}", index=False)
+                stems = _sheet_stems(self.optimized_production)
+                for stem, plan in zip(stems, self.optimized_production.values()):
+                    df = _plan_frame(plan, "Recommended Quantity")
+                    df.to_excel(writer, sheet_name=f"Optimal_{stem}", index=False)
 
 
 def main():
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+
+import main_v02 as m
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def _app_with_results(product_names, sim_days=14):
+    """SupplyChainApp with simulation results but no Tk window"""
+    products = {name: {'shelf_life': 3, 'production_plan': {1: 100, 3: 80}} for name in product_names}
+    distributors = [{'name': 'D1', 'policy_days': 2, 'proportion': 0.5, 'distance_km': 10,
+                     'purchase_days': np.ones(sim_days, dtype=np.bool_),
+                     'preferred_products': list(product_names)}]
+    model = m.PerishableSupplyChain(products, distributors, 0.01, sim_days)
+
+    app = m.SupplyChainApp.__new__(m.SupplyChainApp)
+    app.sim_days = _Var(sim_days)
+    app.all_results = model.run_simulation()
+    app.optimized_production = {name: {1: 5, 2: 0} for name in product_names}
+    app._all_purchases_cached = app._all_waste_cached = None
+    app._combine_results()
+    return app
+
+
+def test_product_filenames_are_safe_and_distinct():
+    names = m._product_filenames(['Milk/2L', 'A:B', '..', 'a:b', 'Milk\\2L'])
+    assert names == ['Milk_2L_1.xlsx', 'A_B_2.xlsx', 'product.xlsx', 'a_b_4.xlsx', 'Milk_2L_5.xlsx']
+
+
+def test_export_with_unsafe_product_names(tmp_path):
+    app = _app_with_results(['Milk/2L', 'A:B'])
+    file_path = str(tmp_path / "results.xlsx")
+
+    assert app._export_to_excel(file_path) == []
+
+    sheets = openpyxl.load_workbook(file_path).sheetnames
+    assert {'Batch_Milk_2L', 'Inventory_Milk_2L', 'Batch_A_B', 'Inventory_A_B',
+            'Optimal_Milk_2L', 'Optimal_A_B'} <= set(sheets)
+
+
+def test_parallel_export_keeps_product_files_in_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(m, 'PARALLEL_EXPORT_MIN_CELLS', 0)
+    monkeypatch.setattr(os, 'cpu_count', lambda: 2)
+    app = _app_with_results(['Milk/2L', 'A:B', '..'])
+    file_path = str(tmp_path / "results.xlsx")
+
+    paths = app._export_to_excel(file_path)
+
+    product_dir = tmp_path / "results_products"
+    assert paths == [str(product_dir / name) for name in ('Milk_2L.xlsx', 'A_B.xlsx', 'product.xlsx')]
+    assert sorted(os.listdir(tmp_path)) == ['results.xlsx', 'results_products']
+    assert openpyxl.load_workbook(paths[0]).sheetnames == ['Batch_Milk_2L', 'Inventory_Milk_2L']